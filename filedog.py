@@ -4,11 +4,22 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from datetime import datetime
 import json
+import re
+import hashlib
 from pathlib import Path
 
 # File extensions to include
 VALID_EXTENSIONS = {'.py', '.html', '.js', '.css', '.dart', '.txt', '.md', '.yaml', '.json', '.xml', '.sql'}
 
+# Sidecar file kept next to the combined output for incremental re-combines
+MANIFEST_SUFFIX = '.filedog-manifest.json'
+MANIFEST_VERSION = 1
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Units for splitting combined output into parts, in bytes per unit.
+# Tokens are a rough estimate of about four bytes of source text per token.
+SHARD_UNITS = {'KB': 1024, 'MB': 1024 * 1024, 'Tokens': 4}
+
 
 class FileDog:
     def __init__(self):
@@ -34,6 +45,9 @@ class FileDog:
         self.base_directory = None
         self.show_hidden = tk.BooleanVar(value=False)
         self.include_all_extensions = tk.BooleanVar(value=False)
+        self.incremental_combine = tk.BooleanVar(value=False)
+        self.shard_limit = tk.StringVar(value="")
+        self.shard_unit = tk.StringVar(value="KB")
 
         # Colors for selection states
         self.colors = {
@@ -80,6 +94,21 @@ class FileDog:
                         variable=self.include_all_extensions, command=self.refresh_tree).grid(row=1, column=0,
                                                                                               sticky=tk.W)
 
+        self.incremental_checkbutton = ttk.Checkbutton(options_frame, text="Incremental combine",
+                                                       variable=self.incremental_combine)
+        self.incremental_checkbutton.grid(row=2, column=0, sticky=tk.W)
+
+        shard_frame = ttk.Frame(options_frame)
+        shard_frame.grid(row=3, column=0, sticky=tk.W, pady=(2, 0))
+
+        ttk.Label(shard_frame, text="Split every").grid(row=0, column=0, sticky=tk.W)
+        ttk.Entry(shard_frame, textvariable=self.shard_limit, width=8).grid(row=0, column=1, padx=2)
+        ttk.Combobox(shard_frame, textvariable=self.shard_unit, values=list(SHARD_UNITS),
+                     state="readonly", width=7).grid(row=0, column=2)
+
+        # Incremental combine only applies to single-file output
+        self.shard_limit.trace_add("write", self.update_incremental_state)
+
         # Selection buttons
         buttons_frame = ttk.Frame(control_frame)
         buttons_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=5)
@@ -175,6 +204,13 @@ class FileDog:
         self.context_menu.add_command(label="📁 Select All in Folder", command=self.select_all_in_folder)
         self.context_menu.add_command(label="🚫 Exclude All in Folder", command=self.exclude_all_in_folder)
 
+    def update_incremental_state(self, *args):
+        """Disable incremental combine while a split size is entered"""
+        if self.shard_limit.get().strip():
+            self.incremental_checkbutton.state(['disabled'])
+        else:
+            self.incremental_checkbutton.state(['!disabled'])
+
     def find_icon_file(self):
         """Find the icon file in common locations"""
         possible_paths = [
@@ -549,6 +585,9 @@ class FileDog:
                 'excluded_folders': list(self.excluded_folders),
                 'show_hidden': self.show_hidden.get(),
                 'include_all_extensions': self.include_all_extensions.get(),
+                'incremental_combine': self.incremental_combine.get(),
+                'shard_limit': self.shard_limit.get(),
+                'shard_unit': self.shard_unit.get(),
                 'timestamp': datetime.now().isoformat()
             }
 
@@ -578,6 +617,9 @@ class FileDog:
                 self.excluded_folders = set(selection_data.get('excluded_folders', []))
                 self.show_hidden.set(selection_data.get('show_hidden', False))
                 self.include_all_extensions.set(selection_data.get('include_all_extensions', False))
+                self.incremental_combine.set(selection_data.get('incremental_combine', False))
+                self.shard_limit.set(selection_data.get('shard_limit', ""))
+                self.shard_unit.set(selection_data.get('shard_unit', "KB"))
 
                 self.status_var.set(f"Base directory: {self.base_directory}")
                 self.refresh_tree()
@@ -594,6 +636,16 @@ class FileDog:
             messagebox.showwarning("Warning", "No files selected!")
             return
 
+        max_bytes = None
+        if self.shard_limit.get().strip():
+            try:
+                max_bytes = int(self.shard_limit.get()) * SHARD_UNITS[self.shard_unit.get()]
+                if max_bytes <= 0:
+                    raise ValueError
+            except (ValueError, KeyError):
+                messagebox.showerror("Error", f"Invalid split size: {self.shard_limit.get()}")
+                return
+
         # Ask for output file location
         output_path = filedialog.asksaveasfilename(
             title="Save Combined File As",
@@ -605,57 +657,324 @@ class FileDog:
         if not output_path:
             return
 
-        self.write_combined_file(selected_files, output_path)
+        if max_bytes:
+            try:
+                shard_paths = self.write_sharded_files(selected_files, output_path, max_bytes)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to combine files: {e}")
+                return
+            result = messagebox.askyesno("Success",
+                                         f"Combined {len(selected_files)} files into {len(shard_paths)} parts!"
+                                         f"\n\nOpen the first part?")
+            if result:
+                try:
+                    os.startfile(shard_paths[0])
+                except:
+                    messagebox.showinfo("Info", f"Parts saved next to: {output_path}")
+            return
+
+        try:
+            reused = self.write_combined_file(selected_files, output_path,
+                                              incremental=self.incremental_combine.get())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to combine files: {e}")
+            return
 
-        result = messagebox.askyesno("Success",
-                                     f"Combined {len(selected_files)} files!\n\nOpen the file?")
+        message = f"Combined {len(selected_files)} files!"
+        if self.incremental_combine.get():
+            message += f"\n{reused} unchanged, {len(selected_files) - reused} updated."
+        result = messagebox.askyesno("Success", f"{message}\n\nOpen the file?")
         if result:
             try:
                 os.startfile(output_path)
             except:
                 messagebox.showinfo("Info", f"File saved at: {output_path}")
 
-    def write_combined_file(self, file_list, output_path):
-        """Write the combined file with all selected files"""
+    def get_relative_path(self, file_path):
+        """Get a file path relative to the base directory for display"""
+        try:
+            return os.path.relpath(file_path, self.base_directory)
+        except ValueError:
+            return file_path
+
+    def encode_output(self, text):
+        """Encode text the way a text-mode output file would be written"""
+        return text.replace('\n', os.linesep).encode('utf-8')
+
+    def render_header(self, file_list, part=None):
+        """Render the summary header listing all files
+
+        When writing one of several parts, part is its 1-based index.
+        """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        with open(output_path, 'w', encoding='utf-8') as out_file:
-            out_file.write(f"# 🐕 FileDog Combined Files\n")
-            out_file.write(f"# Generated on: {timestamp}\n")
-            out_file.write(f"# Base directory: {self.base_directory}\n")
-            out_file.write(f"# Total files: {len(file_list)}\n")
-            out_file.write(f"# Hidden files shown: {self.show_hidden.get()}\n")
-            out_file.write(f"# All extensions included: {self.include_all_extensions.get()}\n\n")
-
-            # Write file list
-            out_file.write("# Selected Files:\n")
-            for file_path in file_list:
-                try:
-                    rel_path = os.path.relpath(file_path, self.base_directory)
-                except ValueError:
-                    rel_path = file_path
-                out_file.write(f"# - {rel_path}\n")
-            out_file.write("\n")
-
-            # Write file contents
-            for file_path in file_list:
-                try:
-                    rel_path = os.path.relpath(file_path, self.base_directory)
-                except ValueError:
-                    rel_path = file_path
+        lines = [
+            f"# 🐕 FileDog Combined Files\n",
+            f"# Generated on: {timestamp}\n",
+            f"# Base directory: {self.base_directory}\n",
+            f"# Total files: {len(file_list)}\n",
+        ]
+        if part:
+            lines.append(f"# Part: {part}\n")
+        lines += [
+            f"# Hidden files shown: {self.show_hidden.get()}\n",
+            f"# All extensions included: {self.include_all_extensions.get()}\n\n",
+            "# Selected Files:\n",
+        ]
+        for file_path in file_list:
+            lines.append(f"# - {self.get_relative_path(file_path)}\n")
+        lines.append("\n")
+        return ''.join(lines)
+
+    def render_segment_header(self, file_path):
+        """Render the banner that precedes a file's contents"""
+        return (f"\n\n{'=' * 80}\n# FILE: {self.get_relative_path(file_path)}\n"
+                f"# Full path: {file_path}\n"
+                f"{'=' * 80}\n")
+
+    def render_file_segment(self, file_path):
+        """Render the output segment for one file
+
+        Returns the encoded segment and the SHA-256 of the file contents,
+        or None for the hash if the file could not be read.
+        """
+        segment = self.render_segment_header(file_path)
+        digest = None
 
-                out_file.write(f"\n\n{'=' * 80}\n# FILE: {rel_path}\n")
-                out_file.write(f"# Full path: {file_path}\n")
-                out_file.write(f"{'=' * 80}\n")
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            # Decode like a text-mode read with universal newlines
+            content = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+            segment += content
+            if not content.endswith('\n'):
+                segment += '\n'
+            digest = hashlib.sha256(data).hexdigest()
+        except Exception as e:
+            segment += f"\n# Failed to read {file_path}: {e}\n"
 
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        out_file.write(content)
-                        if not content.endswith('\n'):
-                            out_file.write('\n')
-                except Exception as e:
-                    out_file.write(f"\n# Failed to read {file_path}: {e}\n")
+        return self.encode_output(segment), digest
+
+    def remove_file(self, path):
+        """Remove a file if it exists"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def load_combine_manifest(self, output_path):
+        """Load the manifest of a previous combine if it still matches its output
+
+        Returns a dict mapping file paths to their manifest entries, or an
+        empty dict when there is nothing that can safely be reused.
+        """
+        try:
+            with open(output_path + MANIFEST_SUFFIX, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            stat = os.stat(output_path)
+            if (manifest.get('version') != MANIFEST_VERSION
+                    or manifest.get('base_directory') != self.base_directory
+                    or manifest.get('linesep') != os.linesep
+                    or manifest.get('output_size') != stat.st_size
+                    or manifest.get('output_mtime_ns') != stat.st_mtime_ns):
+                return {}
+
+            return {entry['path']: entry for entry in manifest.get('files', [])}
+        except Exception:
+            return {}
+
+    def save_combine_manifest(self, output_path, entries):
+        """Save the manifest describing the segments of a combined output"""
+        stat = os.stat(output_path)
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'base_directory': self.base_directory,
+            'linesep': os.linesep,
+            'output_size': stat.st_size,
+            'output_mtime_ns': stat.st_mtime_ns,
+            'files': entries,
+        }
+
+        try:
+            with open(output_path + MANIFEST_SUFFIX, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+        except Exception as e:
+            print(f"Could not save combine manifest: {e}")
+            self.remove_file(output_path + MANIFEST_SUFFIX)
+
+    def copy_segment(self, source, offset, length, destination, expected_prefix):
+        """Block-copy a segment of a previous output into the new one
+
+        The segment must start with expected_prefix, the banner of the file it
+        is supposed to belong to, otherwise the manifest is out of date.
+        """
+        source.seek(offset)
+        if source.read(len(expected_prefix)) != expected_prefix:
+            raise IOError("Previous output does not match its manifest")
+
+        source.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = source.read(min(COPY_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise IOError("Previous output is shorter than its manifest")
+            destination.write(chunk)
+            remaining -= len(chunk)
+
+    def write_combined_segments(self, file_list, write_path, previous, old_path=None):
+        """Write the header and file segments, reusing segments from old_path
+
+        Returns the manifest entries for the written output and the number of
+        reused segments.
+        """
+        old_output = open(old_path, 'rb') if previous else None
+        entries = []
+        reused = 0
+
+        try:
+            with open(write_path, 'wb') as out_file:
+                out_file.write(self.encode_output(self.render_header(file_list)))
+
+                for file_path in file_list:
+                    old = previous.get(file_path)
+                    try:
+                        stat = os.stat(file_path)
+                        size, mtime_ns = stat.st_size, stat.st_mtime_ns
+                    except OSError:
+                        size, mtime_ns = None, None
+
+                    offset = out_file.tell()
+                    if (old and old['hash'] and size is not None
+                            and old['size'] == size and old['mtime_ns'] == mtime_ns):
+                        banner = self.encode_output(self.render_segment_header(file_path))
+                        self.copy_segment(old_output, old['offset'], old['length'], out_file, banner)
+                        digest = old['hash']
+                        reused += 1
+                    else:
+                        segment, digest = self.render_file_segment(file_path)
+                        if old and digest and digest == old['hash']:
+                            # Touched but unchanged, the old segment is identical
+                            reused += 1
+                        out_file.write(segment)
+
+                    entries.append({
+                        'path': file_path,
+                        'size': size,
+                        'mtime_ns': mtime_ns,
+                        'hash': digest,
+                        'offset': offset,
+                        'length': out_file.tell() - offset,
+                    })
+        finally:
+            if old_output:
+                old_output.close()
+
+        return entries, reused
+
+    def write_combined_file(self, file_list, output_path, incremental=False):
+        """Write the combined file with all selected files
+
+        In incremental mode a manifest of (path, size, mtime, hash) is kept next
+        to the output, and segments of unchanged files are copied from the
+        previous output instead of being re-read. If the previous output turns
+        out not to match its manifest, the file is rebuilt in full. Returns the
+        number of reused segments.
+        """
+        manifest_path = output_path + MANIFEST_SUFFIX
+
+        if not incremental:
+            # The output is about to change, so any old manifest no longer applies
+            self.remove_file(manifest_path)
+            self.write_combined_segments(file_list, output_path, {})
+            return 0
+
+        previous = self.load_combine_manifest(output_path)
+        temp_path = output_path + '.tmp'
+
+        try:
+            try:
+                entries, reused = self.write_combined_segments(file_list, temp_path, previous, output_path)
+            except Exception as e:
+                if not previous:
+                    raise
+                print(f"Could not reuse previous output, rebuilding: {e}")
+                entries, reused = self.write_combined_segments(file_list, temp_path, {})
+
+            self.remove_file(manifest_path)
+            os.replace(temp_path, output_path)
+        except Exception:
+            self.remove_file(temp_path)
+            raise
+
+        self.save_combine_manifest(output_path, entries)
+        return reused
+
+    def get_shard_path(self, output_path, index):
+        """Get the numbered path of one part of a split output"""
+        root, ext = os.path.splitext(output_path)
+        return f"{root}_part{index:02d}{ext}"
+
+    def remove_stale_shards(self, output_path):
+        """Remove parts left over from an earlier split of the same output"""
+        root, ext = os.path.splitext(output_path)
+        directory = os.path.dirname(root) or '.'
+        pattern = re.compile(re.escape(os.path.basename(root)) + r'_part\d+' + re.escape(ext))
+
+        for name in os.listdir(directory):
+            if pattern.fullmatch(name):
+                self.remove_file(os.path.join(directory, name))
+
+    def write_shard(self, output_path, index, segments):
+        """Write one part with its own header and its buffered file segments"""
+        shard_path = self.get_shard_path(output_path, index)
+        file_list = [file_path for file_path, _ in segments]
+
+        with open(shard_path, 'wb') as out_file:
+            out_file.write(self.encode_output(self.render_header(file_list, part=index)))
+            for _, segment in segments:
+                out_file.write(segment)
+
+        return shard_path
+
+    def write_sharded_files(self, file_list, output_path, max_bytes):
+        """Write the selected files into numbered parts of at most max_bytes
+
+        Each file is read once and its encoded segment buffered until the part
+        it belongs to is full, so part boundaries use the real output size.
+        Files are never split; one larger than max_bytes gets a part of its
+        own. Each part has its own header listing the files it contains.
+        Returns the paths of the parts written.
+        """
+        self.remove_stale_shards(output_path)
+        shard_paths = []
+        current = []  # (file_path, encoded segment) pairs for the open part
+        listing_size = 0
+        segments_size = 0
+        # The empty header says "Total files: 0", one digit of the real count
+        header_size = len(self.encode_output(self.render_header([], part=1))) - 1
+
+        for file_path in file_list:
+            segment, _ = self.render_file_segment(file_path)
+            line_size = len(self.encode_output(f"# - {self.get_relative_path(file_path)}\n"))
+            part_size = (header_size + len(str(len(current) + 1)) + listing_size + line_size
+                         + segments_size + len(segment))
+
+            if current and part_size > max_bytes:
+                shard_paths.append(self.write_shard(output_path, len(shard_paths) + 1, current))
+                current = []
+                listing_size = 0
+                segments_size = 0
+                header_size = len(self.encode_output(self.render_header([], part=len(shard_paths) + 1))) - 1
+
+            current.append((file_path, segment))
+            listing_size += line_size
+            segments_size += len(segment)
+
+        if current:
+            shard_paths.append(self.write_shard(output_path, len(shard_paths) + 1, current))
+
+        return shard_paths
 
     def run(self):
         """Start the application"""